@@ -5,7 +5,7 @@ MongoDB helper functions ready to use in your backend code.
 Import and use these functions in your API endpoints for database operations.
 """
 
-from pymongo import MongoClient
+from motor.motor_asyncio import AsyncIOMotorClient
 from datetime import datetime, timezone
 import os
 from dotenv import load_dotenv
@@ -22,11 +22,11 @@ database_url = os.getenv("DATABASE_URL")
 database_name = os.getenv("DATABASE_NAME")
 
 if database_url and database_name:
-    _client = MongoClient(database_url)
+    _client = AsyncIOMotorClient(database_url)
     db = _client[database_name]
 
 # Helper functions for common database operations
-def create_document(collection_name: str, data: Union[BaseModel, dict]):
+async def create_document(collection_name: str, data: Union[BaseModel, dict]):
     """Insert a single document with timestamp"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
@@ -40,16 +40,33 @@ def create_document(collection_name: str, data: Union[BaseModel, dict]):
     data_dict['created_at'] = datetime.now(timezone.utc)
     data_dict['updated_at'] = datetime.now(timezone.utc)
 
-    result = db[collection_name].insert_one(data_dict)
+    result = await db[collection_name].insert_one(data_dict)
     return str(result.inserted_id)
 
-def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
+async def create_documents(collection_name: str, docs: list):
+    """Insert multiple documents with timestamps in a single batch"""
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    now = datetime.now(timezone.utc)
+    batch = []
+    for doc in docs:
+        data_dict = doc.model_dump() if isinstance(doc, BaseModel) else doc.copy()
+        data_dict['created_at'] = now
+        data_dict['updated_at'] = now
+        batch.append(data_dict)
+
+    # ordered=False lets Mongo keep going past duplicate-key errors
+    result = await db[collection_name].insert_many(batch, ordered=False)
+    return [str(inserted_id) for inserted_id in result.inserted_ids]
+
+async def get_documents(collection_name: str, filter_dict: dict = None, limit: int = None):
     """Get documents from collection"""
     if db is None:
         raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
-    
+
     cursor = db[collection_name].find(filter_dict or {})
     if limit:
         cursor = cursor.limit(limit)
-    
-    return list(cursor)
+
+    return await cursor.to_list(length=limit)
@@ -1,14 +1,23 @@
 import os
-from typing import List, Optional
-from fastapi import FastAPI, HTTPException
+import re
+import time
+from typing import List, Literal, Optional
+import httpx
+import msgspec
+from fastapi import FastAPI, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import ORJSONResponse
 from datetime import datetime, timezone
 
-from database import db, create_document, get_documents
+from database import db, create_document, create_documents, get_documents
 from schemas import Tool, Course, Lab, Incident, Podcast, ContactMessage, Subscriber
 
-app = FastAPI(title="MRM Cybersecurity API", version="1.0.0")
+app = FastAPI(title="MRM Cybersecurity API", version="1.0.0", default_response_class=ORJSONResponse)
+
+# Collection handles resolved once at import; None when no DB is configured
+TOOLS = db["tool"] if db is not None else None
+COURSES = db["course"] if db is not None else None
+LABS = db["lab"] if db is not None else None
 
 app.add_middleware(
     CORSMiddleware,
@@ -18,28 +27,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-class NewsItem(BaseModel):
+# msgspec Structs for the news hot path: C-speed decode of the upstream
+# envelope and encode of our response, no Pydantic involved.
+class NewsItem(msgspec.Struct):
     title: str
-    description: Optional[str] = None
     url: str
+    description: Optional[str] = None
     image_url: Optional[str] = None
     source: Optional[str] = None
     published_at: Optional[str] = None
 
+class _NewsDataArticle(msgspec.Struct):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    url: Optional[str] = None
+    image_url: Optional[str] = None
+    source_id: Optional[str] = None
+    pubDate: Optional[str] = None
+
+class _NewsDataResponse(msgspec.Struct):
+    results: Optional[List[_NewsDataArticle]] = None
+
+# Shared client so connections (and TLS sessions) are reused across requests.
+# Connect fails fast, reads get the full upstream budget, and HTTP/2 lets
+# concurrent calls multiplex over one connection.
+_news_client = httpx.AsyncClient(
+    timeout=httpx.Timeout(8.0, connect=2.0),
+    limits=httpx.Limits(max_keepalive_connections=4, max_connections=8),
+    http2=True,
+)
+
+@app.on_event("startup")
+async def ensure_indexes():
+    # Index-backed lookups for the /tools filters. The name index carries a
+    # case-insensitive collation so the anchored prefix search stays cheap.
+    if TOOLS is None:
+        return
+    await TOOLS.create_index([("name", 1)], collation={"locale": "en", "strength": 2})
+    await TOOLS.create_index([("category", 1)])
+
 @app.get("/")
 def root():
     return {"name": "MRM Cybersecurity API", "status": "ok"}
 
+@app.get("/livez")
+def livez():
+    # Liveness probe: no DB round-trip, cheap enough to hammer
+    return {"ok": True}
+
+_TEST_SKELETON = {
+    "backend": "✅ Running",
+    "database": "❌ Not Available",
+    "database_url": None,
+    "database_name": None,
+    "connection_status": "Not Connected",
+    "collections": []
+}
+
+# Collection names change rarely; cache them so burst probing of the
+# readiness endpoint doesn't cost a Mongo round-trip per request.
+_COLLECTIONS_TTL = 10.0
+_collections_cache = (0.0, [])
+
 @app.get("/test")
-def test_database():
-    response = {
-        "backend": "✅ Running",
-        "database": "❌ Not Available",
-        "database_url": None,
-        "database_name": None,
-        "connection_status": "Not Connected",
-        "collections": []
-    }
+@app.get("/readyz")
+async def test_database():
+    global _collections_cache
+    response = _TEST_SKELETON.copy()
     try:
         if db is not None:
             response["database"] = "✅ Available"
@@ -47,7 +102,11 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "❌ Unknown"
             response["connection_status"] = "Connected"
             try:
-                response["collections"] = db.list_collection_names()[:10]
+                expires, names = _collections_cache
+                if time.monotonic() >= expires:
+                    names = (await db.list_collection_names())[:10]
+                    _collections_cache = (time.monotonic() + _COLLECTIONS_TTL, names)
+                response["collections"] = names
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
                 response["database"] = f"⚠️ Connected but Error: {str(e)[:80]}"
@@ -59,123 +118,195 @@ def test_database():
 
 # Seed minimal content if needed
 @app.post("/seed")
-def seed():
+async def seed():
     try:
         # Only seed if empty
         if db is None:
             raise HTTPException(500, "Database not configured")
-        if db["tool"].count_documents({}) == 0:
-            create_document("tool", Tool(name="Nmap", description="Network exploration tool and security / port scanner.", category="Reconnaissance", tags=["network", "scanner"], popularity=95, difficulty="Intermediate", link="https://nmap.org").model_dump())
-            create_document("tool", Tool(name="Wireshark", description="Network protocol analyzer.", category="Forensics", tags=["packet", "analyzer"], popularity=90, difficulty="Beginner", link="https://www.wireshark.org").model_dump())
-        if db["course"].count_documents({}) == 0:
-            create_document("course", Course(title="Ethical Hacking Basics", difficulty="Beginner", slug="ethical-hacking-basics", description="Kickstart into ethical hacking.").model_dump())
-            create_document("course", Course(title="Linux for Hackers", difficulty="Beginner", slug="linux-for-hackers").model_dump())
-        if db["lab"].count_documents({}) == 0:
-            create_document("lab", Lab(title="Intro Recon Lab", category="Beginner", estimated_minutes=20, score=0).model_dump())
+        if await TOOLS.find_one({}, projection={"_id": 1}) is None:
+            await create_documents("tool", [
+                Tool.model_construct(name="Nmap", description="Network exploration tool and security / port scanner.", category="Reconnaissance", tags=["network", "scanner"], popularity=95, difficulty="Intermediate", link="https://nmap.org").model_dump(),
+                Tool.model_construct(name="Wireshark", description="Network protocol analyzer.", category="Forensics", tags=["packet", "analyzer"], popularity=90, difficulty="Beginner", link="https://www.wireshark.org").model_dump(),
+            ])
+        if await COURSES.find_one({}, projection={"_id": 1}) is None:
+            await create_documents("course", [
+                Course.model_construct(title="Ethical Hacking Basics", difficulty="Beginner", slug="ethical-hacking-basics", description="Kickstart into ethical hacking.").model_dump(),
+                Course.model_construct(title="Linux for Hackers", difficulty="Beginner", slug="linux-for-hackers").model_dump(),
+            ])
+        if await LABS.find_one({}, projection={"_id": 1}) is None:
+            await create_documents("lab", [
+                Lab.model_construct(title="Intro Recon Lab", category="Beginner", estimated_minutes=20, score=0).model_dump(),
+            ])
         return {"status": "ok"}
     except Exception as e:
         raise HTTPException(500, str(e))
 
+_DIFF_ORDER = {"Beginner": 0, "Intermediate": 1, "Advanced": 2}
+
+# Pipeline fragments per sort mode, built once at import instead of per
+# request. Difficulty is stored as a string, so rank it server-side with
+# $switch and drop the helper field before the docs leave Mongo.
+_SORT_STAGES = {
+    "popularity": ({"$sort": {"popularity": -1}},),
+    "category": ({"$sort": {"category": 1}},),
+    "difficulty": (
+        {"$addFields": {"_difficulty_rank": {"$switch": {
+            "branches": [
+                {"case": {"$eq": ["$difficulty", name]}, "then": rank}
+                for name, rank in _DIFF_ORDER.items()
+            ],
+            "default": 0,
+        }}}},
+        {"$sort": {"_difficulty_rank": 1}},
+        {"$unset": "_difficulty_rank"},
+    ),
+}
+
 # Basic endpoints for tools and courses (read-only for now)
 @app.get("/tools")
-def list_tools(q: Optional[str] = None, category: Optional[str] = None, sort: Optional[str] = None):
-    if db is None:
+async def list_tools(
+    q: Optional[str] = Query(default=None, min_length=1, max_length=64),
+    category: Optional[Literal[
+        "Reconnaissance", "Exploitation", "Forensics", "Web Security", "Wireless", "OSINT"
+    ]] = None,
+    sort: Optional[Literal["popularity", "difficulty", "category"]] = None,
+    limit: int = Query(default=100, ge=1, le=500),
+):
+    if TOOLS is None:
         return []
     filter_dict = {}
     if q:
-        filter_dict["name"] = {"$regex": q, "$options": "i"}
+        # Escaped, anchored prefix match: Mongo can walk the name index and
+        # user input can't smuggle in regex metacharacters.
+        filter_dict["name"] = {"$regex": f"^{re.escape(q)}", "$options": "i"}
     if category:
         filter_dict["category"] = category
-    tools = list(db["tool"].find(filter_dict))
-    for t in tools:
-        t["_id"] = str(t["_id"]) 
-    if sort == "popularity":
-        tools.sort(key=lambda x: x.get("popularity", 0), reverse=True)
-    elif sort == "difficulty":
-        diff_order = {"Beginner": 0, "Intermediate": 1, "Advanced": 2}
-        tools.sort(key=lambda x: diff_order.get(x.get("difficulty", "Beginner"), 0))
-    elif sort == "category":
-        tools.sort(key=lambda x: x.get("category", ""))
-    return tools
+    stages = ()
+    if sort is not None:
+        stages = _SORT_STAGES.get(sort)
+        if stages is None:
+            raise HTTPException(400, f"Unsupported sort: {sort!r}")
+    pipeline = [{"$match": filter_dict}]
+    pipeline += stages
+    pipeline += [
+        {"$limit": limit},
+        # Stringify ObjectId in Mongo so no Python loop touches the docs
+        {"$addFields": {"_id": {"$toString": "$_id"}}},
+    ]
+    return await TOOLS.aggregate(pipeline).to_list(length=limit)
 
 @app.get("/courses")
-def list_courses():
-    if db is None:
+async def list_courses():
+    if COURSES is None:
         return []
-    courses = list(db["course"].find({}))
-    for c in courses:
-        c["_id"] = str(c["_id"]) 
-    return courses
+    return await COURSES.aggregate([
+        {"$addFields": {"_id": {"$toString": "$_id"}}},
+    ]).to_list(length=None)
+
+# The upstream feed updates on the order of minutes, so serve the serialized
+# bytes from cache: 5 min for real articles, 30s for the fallback sample so
+# its timestamp stays fresh-ish.
+_NEWS_TTL = 300.0
+_SAMPLE_TTL = 30.0
+_news_cache = (0.0, b"")
 
 # News proxy endpoint (reads from external APIs if key present, else returns sample)
-@app.get("/news", response_model=List[NewsItem])
-def get_news():
+@app.get("/news")
+async def get_news():
+    global _news_cache
+    expires, body = _news_cache
+    if body and time.monotonic() < expires:
+        return Response(content=body, media_type="application/json")
     api_key = os.getenv("NEWSDATA_API_KEY") or os.getenv("NEWSAPI_KEY")
     items: List[NewsItem] = []
     if api_key:
         try:
-            import requests
             # Try NewsData.io
             url = f"https://newsdata.io/api/1/latest?apikey={api_key}&q=cybersecurity&country=us,gb,ca&language=en"
-            r = requests.get(url, timeout=8)
-            data = r.json()
-            for a in (data.get("results") or [])[:12]:
-                items.append(NewsItem(
-                    title=a.get("title") or "Untitled",
-                    description=a.get("description"),
-                    url=a.get("link") or a.get("url") or "",
-                    image_url=a.get("image_url") or a.get("image_url") or None,
-                    source=a.get("source_id"),
-                    published_at=a.get("pubDate") or a.get("pubDate")
-                ))
+            r = await _news_client.get(url)
+            data = msgspec.json.decode(r.content, type=_NewsDataResponse)
+            items = [
+                NewsItem(
+                    title=a.title or "Untitled",
+                    description=a.description,
+                    url=a.link or a.url or "",
+                    image_url=a.image_url,
+                    source=a.source_id,
+                    published_at=a.pubDate,
+                )
+                for a in (data.results or [])[:12]
+            ]
         except Exception:
             pass
+    ttl = _NEWS_TTL
     if not items:
         # fallback sample
+        ttl = _SAMPLE_TTL
         now = datetime.now(timezone.utc).isoformat()
         items = [
             NewsItem(title="Latest CVE trends show rise in supply-chain attacks", url="https://thehackernews.com/", source="Sample", published_at=now),
             NewsItem(title="Krebs: Major ISP suffers DDoS impacting services", url="https://krebsonsecurity.com/", source="Sample", published_at=now),
             NewsItem(title="ThreatPost: Critical bug patched in popular router firmware", url="https://threatpost.com/", source="Sample", published_at=now),
         ]
-    return items
+    body = msgspec.json.encode(items)
+    _news_cache = (time.monotonic() + ttl, body)
+    return Response(content=body, media_type="application/json")
+
+# Simple incidents demo (would normally come from external feeds).
+# The payload is constant except for the timestamp, so build it once at import
+# and memoize the iso string per second.
+_INCIDENTS_TEMPLATE = (
+    {
+        "country": "US", "type": "DDoS", "severity": "High",
+        "description": "Large-scale DDoS on hosting provider.", "mitre_attack_vector": "T1498"
+    },
+    {
+        "country": "DE", "type": "Malware", "severity": "Medium",
+        "description": "Emotet activity resurgence.", "mitre_attack_vector": "T1204"
+    },
+    {
+        "country": "IN", "type": "Phishing", "severity": "Low",
+        "description": "Targeted phishing campaign detected.", "mitre_attack_vector": "T1566"
+    },
+)
+
+_now_iso_cache = (0, "")
+
+def _cached_now_iso() -> str:
+    global _now_iso_cache
+    sec = int(time.time())
+    if sec != _now_iso_cache[0]:
+        _now_iso_cache = (sec, datetime.now(timezone.utc).isoformat())
+    return _now_iso_cache[1]
 
-# Simple incidents demo (would normally come from external feeds)
 @app.get("/incidents")
 def incidents():
-    now = datetime.now(timezone.utc)
-    sample = [
-        {
-            "country": "US", "type": "DDoS", "severity": "High", "time": now.isoformat(),
-            "description": "Large-scale DDoS on hosting provider.", "mitre_attack_vector": "T1498"
-        },
-        {
-            "country": "DE", "type": "Malware", "severity": "Medium", "time": now.isoformat(),
-            "description": "Emotet activity resurgence.", "mitre_attack_vector": "T1204"
-        },
-        {
-            "country": "IN", "type": "Phishing", "severity": "Low", "time": now.isoformat(),
-            "description": "Targeted phishing campaign detected.", "mitre_attack_vector": "T1566"
-        },
-    ]
-    return sample
+    now = _cached_now_iso()
+    return [{**i, "time": now} for i in _INCIDENTS_TEMPLATE]
 
 # Newsletter subscription and contact endpoints
 @app.post("/subscribe")
-def subscribe(sub: Subscriber):
+async def subscribe(sub: Subscriber):
     if db is None:
         return {"status": "disabled"}
-    create_document("subscriber", sub)
+    await create_document("subscriber", sub.model_dump())
     return {"status": "ok"}
 
 @app.post("/contact")
-def contact(msg: ContactMessage):
+async def contact(msg: ContactMessage):
     if db is None:
         return {"status": "disabled"}
-    create_document("contactmessage", msg)
+    await create_document("contactmessage", msg.model_dump())
     return {"status": "ok"}
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
@@ -0,0 +1,17 @@
+"""
+Optional AOT build for the schema module.
+
+Compiling schemas.py with Cython replaces bytecode interpreter dispatch with
+direct C calls for the model definitions instantiated on every POST and seed.
+The pure-Python module keeps working when the extension is not built, so this
+step is opt-in:
+
+    python setup.py build_ext --inplace
+"""
+from setuptools import setup
+from Cython.Build import cythonize
+
+setup(
+    name="mrm-cybersecurity-api",
+    ext_modules=cythonize(["schemas.py"], language_level=3),
+)